@@ -8,20 +8,127 @@ The connector is hardcoded to use the S3 bucket. From that bucket we only handle
 Also we use the path of the file to generate the backstage URL.
 """
 
+import queue
+import re
+import threading
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from datetime import timezone
-from typing import List
+from functools import lru_cache
+from hashlib import sha1
+from html import unescape
+from typing import Any, List
+from urllib.parse import quote
+
+import bs4
+import lxml.html
 
 from onyx.configs.app_configs import INDEX_BATCH_SIZE
 from onyx.configs.constants import BlobType, DocumentSource
 from onyx.connectors.blob.connector import BlobStorageConnector
 from onyx.connectors.models import Document, TextSection
 from onyx.connectors.interfaces import GenerateDocumentsOutput
-from onyx.file_processing.html_utils import web_html_cleanup, parse_html_page_basic
+from onyx.connectors.backstage.section_splitter import (
+    extract_section_anchors_from_html,
+    get_splitter,
+)
+from onyx.file_processing.html_utils import (
+    BS4_PARSER,
+    ParsedHTML,
+    format_document_soup,
+    web_html_cleanup,
+)
 from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
 
+# Backstage (mkdocs) pages keep the <title> in the first few KB, so a cheap
+# regex over the start of the document usually resolves it without any HTML
+# parsing. Operates on the raw bytes so no decode of the body is needed;
+# falls back to a real parse when it misses.
+_TITLE_RE = re.compile(rb"<title[^>]*>([^<]{1,512})</title>", re.IGNORECASE)
+_TITLE_SEARCH_WINDOW = 16384
+
+# TechDocs pages always live under an entity directory, so a single suffix
+# check covers both "is an index.html" and "is not a directory marker".
+# A bare index.html at the bucket root is not supported.
+_INDEX_SUFFIX = "/index.html"
+
+# MkDocs (TechDocs) pages keep all document text inside
+# <article class="md-content__inner md-typeset">. Restricting the parse to
+# that subtree (plus <title>) lets bs4 skip building nodes for the header,
+# nav drawer and footer, which make up most of the bytes on a typical page.
+_TECHDOCS_STRAINER = bs4.SoupStrainer(["title", "article"])
+
+# Content-hash memo for the sanitize step: byte-identical pages (common when
+# entities ship generated or templated docs) skip the parse/cleanup entirely
+_PARSE_CACHE_MAX = 256
+
+
+@lru_cache(maxsize=4096)
+def _quote_path(dir_path: str) -> str:
+    """URL-quote a directory path, cached since sibling index.html files
+    share parent directories."""
+    return quote(dir_path, safe="/")
+
+# Object downloads are network-bound and independent, so they are fetched
+# concurrently. The S3 client pool (see blob connector) is sized with
+# headroom above this.
+_MAX_DOWNLOAD_WORKERS = 16
+
+# How many listing pages may be buffered ahead of the consumer
+_PAGE_QUEUE_DEPTH = 2
+_PAGE_SENTINEL: Any = object()
+
+
+def _prefetched_pages(pages: Iterable[dict]) -> Iterator[dict]:
+    """Iterate S3 listing pages while the next ones are fetched in the background.
+
+    ListObjectsV2 round-trips otherwise serialize with download/parse work;
+    a small bounded queue lets the listing run ahead without unbounded buffering.
+    """
+    page_queue: queue.Queue = queue.Queue(maxsize=_PAGE_QUEUE_DEPTH)
+    # Set when the consumer abandons the generator (the runner closes batch
+    # generators on indexing failure); without it the producer would stay
+    # blocked in put() forever, leaking the thread and its paginator
+    consumer_gone = threading.Event()
+
+    def _enqueue(item: Any) -> bool:
+        while not consumer_gone.is_set():
+            try:
+                page_queue.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _producer() -> None:
+        try:
+            for page in pages:
+                if not _enqueue(page):
+                    return
+            _enqueue(_PAGE_SENTINEL)
+        except Exception as e:
+            _enqueue(e)
+
+    threading.Thread(
+        target=_producer, daemon=True, name="backstage_s3_listing"
+    ).start()
+
+    try:
+        while True:
+            item = page_queue.get()
+            if item is _PAGE_SENTINEL:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # reached on GeneratorExit and on errors as well as normal
+        # completion; lets the producer bail out of put()
+        consumer_gone.set()
+
 
 class BackstageConnector(BlobStorageConnector):
     """Connector for Backstage documentation pages stored in S3.
@@ -49,6 +156,14 @@ class BackstageConnector(BlobStorageConnector):
         )
         self._allow_images = False  # Always disable images for backstage connector
         self.backstage_url = backstage_url[:-1] if backstage_url.endswith("/") else backstage_url
+        # Parsed-HTML results keyed by content digest, evicted oldest-first.
+        # Read and written from the download worker threads, so every
+        # get/evict/insert holds the lock; the parse itself runs outside it.
+        self._parse_cache: dict = {}
+        self._parse_cache_lock = threading.Lock()
+        # Document id prefix is constant per connector; concatenation in the
+        # hot loop is cheaper than re-formatting the full f-string per object
+        self._doc_id_prefix = f"backstage:{self.bucket_name}:"
 
     # Override the _yield_blob_objects parent method to specifically handle Backstage documentation pages
     def _yield_blob_objects(
@@ -63,87 +178,203 @@ class BackstageConnector(BlobStorageConnector):
         pages = paginator.paginate(Bucket=self.bucket_name, Prefix=self.prefix)
 
         batch: List[Document] = []
-        for page in pages:
-            if "Contents" not in page:
-                continue
-
-            for obj in page["Contents"]:
-                key = obj["Key"]
-                
-                # Skip directories and non-index.html files
-                if key.endswith("/") or not key.endswith("index.html"):
+        # Hoist the attribute lookup out of the per-object loop
+        batch_size = self.batch_size
+        # Cap in-flight downloads so only a bounded number of HTML bodies are
+        # held in memory at once
+        download_window = max(batch_size * 2, _MAX_DOWNLOAD_WORKERS)
+        with ThreadPoolExecutor(max_workers=_MAX_DOWNLOAD_WORKERS) as executor:
+            for page in _prefetched_pages(pages):
+                if "Contents" not in page:
                     continue
 
-                last_modified = obj["LastModified"].replace(tzinfo=timezone.utc)
+                to_fetch: List[tuple] = []
+                for obj in page["Contents"]:
+                    key = obj["Key"]
 
-                if not start <= last_modified <= end:
-                    continue
+                    # Skip directories and non-index.html files. The short
+                    # extension slice rejects the bulk of asset keys (css/js/
+                    # images) before the longer suffix comparison runs
+                    if key[-5:] != ".html" or not key.endswith(_INDEX_SUFFIX):
+                        continue
+
+                    # boto3 usually returns tz-aware UTC datetimes already; only
+                    # allocate a replacement when the tzinfo is actually missing
+                    last_modified = obj["LastModified"]
+                    if last_modified.tzinfo is None:
+                        last_modified = last_modified.replace(tzinfo=timezone.utc)
+
+                    if not start <= last_modified <= end:
+                        continue
+
+                    to_fetch.append((key, last_modified))
+
+                for window_start in range(0, len(to_fetch), download_window):
+                    window = to_fetch[window_start:window_start + download_window]
+                    futures = [
+                        (key, executor.submit(self._process_object, key, last_modified))
+                        for key, last_modified in window
+                    ]
+                    for key, future in futures:
+                        try:
+                            batch.append(future.result())
+
+                            if len(batch) == batch_size:
+                                # One progress line per batch; %-style defers
+                                # formatting until the level is known enabled
+                                logger.info(
+                                    "Processed batch of %d Backstage documents (last key=%s)",
+                                    len(batch),
+                                    key,
+                                )
+                                yield batch
+                                batch = []
+
+                        except Exception as e:
+                            logger.exception(f"Error processing Backstage HTML file {key}: {e}")
+                            continue
 
-                try:
-                    downloaded_file = self._download_object(key)
-                    html_content = downloaded_file.decode('utf-8', errors='replace')
-                    semantic_id = self._generate_semantic_identifier(key, html_content)
-                    sections = self._split_document_into_sections(html_content, key)
-
-                    batch.append(
-                        Document(
-                            id=f"backstage:{self.bucket_name}:{key}",
-                            sections=sections,
-                            source=DocumentSource.BACKSTAGE,
-                            semantic_identifier=semantic_id,
-                            doc_updated_at=last_modified,
-                            metadata={
-                                "original_path": key,
-                                "backstage_path": key.rsplit('/', 1)[0] if '/' in key else '',
-                            },
-                        )
-                    )
-                    
-                    if len(batch) == self.batch_size:
-                        yield batch
-                        batch = []
-
-                except Exception as e:
-                    logger.exception(f"Error processing Backstage HTML file {key}: {e}")
-                    continue
-                    
         if batch:
+            logger.info("Processed final batch of %d Backstage documents", len(batch))
             yield batch
+
+    def _process_object(self, key: str, last_modified: datetime) -> Document:
+        """Download one index.html and build its Document.
+
+        Runs on a worker thread so the decode/cleanup cost overlaps with other
+        objects' downloads instead of serializing on the generator thread.
+        """
+        downloaded_file = self._download_object(key)
+        # The directory of the key is needed in several places below; rpartition
+        # never raises and returns '' for keys without a slash
+        dir_path = key.rpartition('/')[0]
+        # Parse/clean the HTML once and reuse the result for both the
+        # title and the section text. The parser gets the raw bytes - it
+        # detects the declared encoding itself and avoids a second full copy.
+        # Byte-identical bodies reuse the previously computed result.
+        content_key = sha1(downloaded_file).digest()
+        with self._parse_cache_lock:
+            parsed_html = self._parse_cache.get(content_key)
+        if parsed_html is None:
+            # Concurrent identical bodies may parse twice; that beats holding
+            # the lock across the parse
+            parsed_html = self._sanitize_html_content(downloaded_file)
+            with self._parse_cache_lock:
+                while len(self._parse_cache) >= _PARSE_CACHE_MAX:
+                    self._parse_cache.pop(next(iter(self._parse_cache)), None)
+                self._parse_cache[content_key] = parsed_html
+        semantic_id = self._generate_semantic_identifier(
+            dir_path, downloaded_file, parsed_title=parsed_html.title
+        )
+        sections = self._split_document_into_sections(
+            parsed_html.cleaned_text, dir_path, downloaded_file
+        )
+
+        # All fields are built from known-good values in this module, so skip
+        # pydantic validation in the hot loop
+        document = Document.model_construct(
+            id=self._doc_id_prefix + key,
+            sections=sections,
+            source=DocumentSource.BACKSTAGE,
+            semantic_identifier=semantic_id,
+            doc_updated_at=last_modified,
+            metadata={
+                "original_path": key,
+                "backstage_path": dir_path,
+            },
+        )
+        return document
     
-    def _generate_semantic_identifier(self, key: str, html_content: str = "") -> str:
-        # Try to extract title from HTML if available
+    def _generate_semantic_identifier(
+        self, dir_path: str, html_content: bytes = b"", parsed_title: str | None = None
+    ) -> str:
+        # Try to extract title from HTML if available. Only the <title> tag is
+        # needed, so use lxml directly instead of a full BeautifulSoup cleanup
+        # pass - much cheaper for every index.html in the bucket. The regex
+        # runs on the raw bytes so the body is never decoded just for this.
         if html_content:
+            match = _TITLE_RE.search(html_content[:_TITLE_SEARCH_WINDOW])
+            if match:
+                title = unescape(
+                    match.group(1).decode("utf-8", errors="replace")
+                ).strip()
+                if title:
+                    return title
+            # Reuse the title from the sanitization pass instead of re-parsing
+            if parsed_title and parsed_title.strip():
+                return parsed_title.strip()
             try:
-                parsed_html = web_html_cleanup(html_content)
-                if parsed_html.title:
-                    return parsed_html.title
+                title = lxml.html.fromstring(html_content).findtext(".//title")
+                if title and title.strip():
+                    return title.strip()
             except Exception as e:
-                logger.debug(f"Error extracting title from HTML: {e}")
+                logger.debug("Error extracting title from HTML: %s", e)
         
         # Default to using the directory path as the semantic identifier
-        path = key.rsplit('/', 1)[0] if '/' in key else ''
-        return path or "Backstage Root"
+        return dir_path or "Backstage Root"
 
-    def _split_document_into_sections(self, html_content: str, key: str) -> List[TextSection]:
-        backstage_url = self._get_backstage_url(key)
-        sanitized_content = self._sanitize_html_content(html_content)
+    def _split_document_into_sections(
+        self, sanitized_content: str, dir_path: str, html_content: bytes = b""
+    ) -> List[TextSection]:
+        backstage_url = self._get_backstage_url(dir_path)
+
+        # Split on markdown headers so each section links to its anchor on the
+        # page. The splitter finds no headers when cleanup stripped the
+        # formatting, in which case the whole page stays a single section.
+        if html_content:
+            try:
+                section_anchors = extract_section_anchors_from_html(html_content)
+                markdown_sections = get_splitter().split_into_sections(
+                    sanitized_content, section_anchors
+                )
+                if markdown_sections:
+                    return [
+                        TextSection.model_construct(
+                            link=(
+                                f"{backstage_url}#{section.anchor}"
+                                if section.anchor
+                                else backstage_url
+                            ),
+                            text=section.content,
+                        )
+                        for section in markdown_sections
+                    ]
+            except Exception as e:
+                logger.warning(
+                    f"Error splitting Backstage page into sections: {e}. "
+                    "Falling back to a single section."
+                )
+
+        return [TextSection.model_construct(link=backstage_url, text=sanitized_content)]
+
+    def _sanitize_html_content(self, html_content: str | bytes) -> ParsedHTML:
+        # Build the soup once so the basic-parsing fallback reuses the same
+        # tree instead of re-parsing the document from scratch
+        try:
+            soup = bs4.BeautifulSoup(
+                html_content, BS4_PARSER, parse_only=_TECHDOCS_STRAINER
+            )
+            if soup.find("article", class_="md-content__inner") is None:
+                # Not the standard TechDocs layout - parse the whole document
+                soup = bs4.BeautifulSoup(html_content, BS4_PARSER)
+        except Exception as e:
+            logger.error(f"Error parsing HTML: {e}. Returning raw HTML.")
+            if isinstance(html_content, bytes):
+                html_content = html_content.decode("utf-8", errors="replace")
+            return ParsedHTML(title=None, cleaned_text=html_content)
 
-        # Currently returns a single section with the entire content
-        return [TextSection(link=backstage_url, text=sanitized_content)]
-    
-    def _sanitize_html_content(self, html_content: str) -> str:
         try:
-            parsed_html = web_html_cleanup(html_content)
-            return parsed_html.cleaned_text
+            return web_html_cleanup(soup)
         except Exception as e:
             logger.warning(f"Error sanitizing HTML: {e}. Falling back to basic parsing.")
             try:
-                return parse_html_page_basic(html_content)
+                return ParsedHTML(title=None, cleaned_text=format_document_soup(soup))
             except Exception as e2:
                 logger.error(f"Error with basic HTML parsing: {e2}. Returning raw HTML.")
-                return html_content
+                if isinstance(html_content, bytes):
+                    html_content = html_content.decode("utf-8", errors="replace")
+                return ParsedHTML(title=None, cleaned_text=html_content)
     
-    def _get_backstage_url(self, key: str) -> str:
-        # Remove the 'index.html' part from the path
-        path = key.rsplit('/', 1)[0] if '/' in key else ''
-        return f"{self.backstage_url}/{path}"
+    def _get_backstage_url(self, dir_path: str) -> str:
+        # dir_path is the object key with the 'index.html' part already removed
+        return f"{self.backstage_url}/{_quote_path(dir_path)}"
@@ -0,0 +1,295 @@
+"""Split cleaned Backstage (TechDocs) page text into linkable sections.
+
+TechDocs renders each markdown header as an <h1>..<h6> tag carrying a stable
+``id`` anchor. When the HTML cleanup preserves markdown-style headers in the
+extracted text (trafilatura with formatting enabled), a page can be split into
+one section per header, each linking straight to its anchor - which gives much
+better search attribution than a single section spanning the whole page. When
+no markdown headers survive cleanup the splitter finds nothing and the
+connector falls back to a single section.
+"""
+
+import re
+import string
+import sys
+from collections.abc import Iterator
+from dataclasses import dataclass
+from enum import Enum
+from functools import lru_cache
+
+import bs4
+
+from onyx.file_processing.html_utils import BS4_PARSER
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+_HEADER_NAMES = ["h1", "h2", "h3", "h4", "h5", "h6"]
+# Anchor extraction only ever looks at header tags carrying an id, so tell
+# the parser to skip building nodes for the rest of the page entirely
+_HEADER_STRAINER = bs4.SoupStrainer(_HEADER_NAMES, id=True)
+
+# Only lines opening with one of these characters can be a header, a code
+# fence, or an indented variant of either; anything else is prose
+_SIGNIFICANT_FIRST_CHARS = frozenset("#`~ \t")
+
+# Compiled once at import; the anchor patterns run per unmatched title
+_ANCHOR_STRIP_RE = re.compile(r"[^\w\s-]")
+_ANCHOR_DASH_RE = re.compile(r"[-\s]+")
+# For ASCII titles (the overwhelming majority) punctuation removal is a
+# single C-level translate instead of a regex substitution. '-' and '_' stay,
+# matching the [^\w\s-] class above.
+_ANCHOR_DELETE_TABLE = str.maketrans(
+    "", "", string.punctuation.replace("-", "").replace("_", "")
+)
+
+
+class SplittingMode(str, Enum):
+    HIERARCHICAL = "hierarchical"
+    NON_HIERARCHICAL = "non_hierarchical"
+
+
+@dataclass
+class MarkdownHeader:
+    level: int
+    title: str
+    line_number: int
+    # Start offset of the header's line within the original markdown string;
+    # section content is sliced between consecutive header offsets
+    offset: int
+    anchor: str | None
+
+
+@dataclass
+class MarkdownSection:
+    title: str
+    content: str
+    level: int
+    anchor: str | None
+
+
+@lru_cache(maxsize=4096)
+def _generate_anchor_from_title(title: str) -> str:
+    # Mirrors the mkdocs slugify: lowercase, strip punctuation, dashes.
+    # The same titles ("Overview", "Installation", ...) recur across pages,
+    # so cache the result per title.
+    lowered = title.lower()
+    if lowered.isascii():
+        lowered = lowered.translate(_ANCHOR_DELETE_TABLE)
+    else:
+        # only non-ASCII titles need the full \w-aware character class
+        lowered = _ANCHOR_STRIP_RE.sub("", lowered)
+    anchor = _ANCHOR_DASH_RE.sub("-", lowered)
+    return anchor.strip("-")
+
+
+def extract_section_anchors_from_html(html_content: str | bytes) -> dict[str, str]:
+    """Map header text -> anchor id for every h1-h6 carrying an id."""
+    soup = bs4.BeautifulSoup(html_content, BS4_PARSER, parse_only=_HEADER_STRAINER)
+
+    section_anchors: dict[str, str] = {}
+    # One pass over the (header-only) tree instead of a find_all per level
+    for header in soup.find_all(_HEADER_NAMES):
+        # MkDocs appends a pilcrow permalink as a direct child of the header;
+        # skip it while collecting text rather than decompose()-ing it, which
+        # mutates the tree per header
+        parts: list[str] = []
+        for child in header.children:
+            if isinstance(child, bs4.element.Tag):
+                if child.name == "a" and "headerlink" in (child.get("class") or ()):
+                    continue
+                parts.append(child.get_text())
+            elif isinstance(child, bs4.element.NavigableString) and not isinstance(
+                child, (bs4.element.Comment, bs4.element.Doctype)
+            ):
+                parts.append(str(child))
+        header_text = "".join(parts).strip()
+        if header_text:
+            section_anchors[header_text] = header["id"]
+    return section_anchors
+
+
+class MarkdownSectionSplitter:
+    """Split markdown-formatted text on its headers.
+
+    Hierarchical mode gives each header everything up to the next header of
+    the same or higher level (so parent sections include their subsections);
+    non-hierarchical mode cuts at every header.
+    """
+
+    def __init__(
+        self, splitting_mode: SplittingMode = SplittingMode.HIERARCHICAL
+    ) -> None:
+        self.splitting_mode = splitting_mode
+        # resolved once so the per-document mode test is a plain bool load
+        self._hierarchical = splitting_mode is SplittingMode.HIERARCHICAL
+        logger.debug("Splitting mode: %s", splitting_mode.value)
+
+    def split_into_sections(
+        self, markdown_content: str, section_anchors: dict[str, str]
+    ) -> list[MarkdownSection]:
+        return list(self.iter_sections(markdown_content, section_anchors))
+
+    def iter_sections(
+        self, markdown_content: str, section_anchors: dict[str, str]
+    ) -> Iterator[MarkdownSection]:
+        """Lazily yield sections; in hierarchical mode parent sections repeat
+        their subsections' content, so streaming keeps peak memory at one
+        section instead of the whole expanded list."""
+        # One pass over the lines finds the headers and their offsets; the
+        # splitters then only touch the H header records, never the full
+        # document again
+        lines = markdown_content.split("\n")
+        headers = self.parse_markdown_headers(lines, section_anchors)
+        if not headers:
+            return
+
+        if self._hierarchical:
+            yield from self._split_hierarchical(markdown_content, headers)
+        else:
+            yield from self._split_non_hierarchical(markdown_content, headers)
+
+    def parse_markdown_headers(
+        self, lines: list[str], section_anchors: dict[str, str]
+    ) -> list[MarkdownHeader]:
+        headers: list[MarkdownHeader] = []
+        # Lowercase the anchor titles once up front; the match fallback used
+        # to re-lower every anchor title for every header that missed.
+        # Interning the keys lets recurring titles across a crawl resolve by
+        # pointer identity instead of a character compare.
+        lower_anchors = {
+            sys.intern(anchor_title.lower()): anchor
+            for anchor_title, anchor in section_anchors.items()
+        }
+        in_code_fence = False
+        line_offset = 0
+        for line_number, line in enumerate(lines, start=1):
+            line_start = line_offset
+            line_offset += len(line) + 1
+
+            # The vast majority of lines are prose; a single first-character
+            # test rules them out before paying for the strip. Lines inside a
+            # fence that start with other characters fall through here too -
+            # they could never toggle the fence or become a header anyway.
+            if line[:1] not in _SIGNIFICANT_FIRST_CHARS:
+                continue
+
+            stripped_line = line.strip()
+
+            # '#' inside fenced code blocks is a comment, not a header
+            if stripped_line.startswith("```") or stripped_line.startswith("~~~"):
+                in_code_fence = not in_code_fence
+                continue
+            if in_code_fence:
+                continue
+
+            if not stripped_line.startswith("#"):
+                continue
+
+            # Count the leading #s by hand: more than six, or no whitespace
+            # after them, means the line is not a header
+            level = 0
+            for char in stripped_line:
+                if char != "#":
+                    break
+                level += 1
+            if (
+                level > 6
+                or level == len(stripped_line)
+                or not stripped_line[level].isspace()
+            ):
+                continue
+
+            title = stripped_line[level:].strip()
+            if not title:
+                continue
+            anchor = self._find_closest_anchor_match(
+                title, section_anchors, lower_anchors
+            )
+            if anchor is None:
+                anchor = _generate_anchor_from_title(title)
+            headers.append(MarkdownHeader(level, title, line_number, line_start, anchor))
+        return headers
+
+    def _find_closest_anchor_match(
+        self,
+        title: str,
+        section_anchors: dict[str, str],
+        lower_anchors: dict[str, str],
+    ) -> str | None:
+        exact = section_anchors.get(title)
+        if exact is not None:
+            return exact
+
+        # Cleanup may alter casing or drop inline markup; the pre-lowered map
+        # resolves case-only mismatches in one lookup, and only real misses
+        # pay for the containment scan
+        title_lower = sys.intern(title.lower())
+        exact = lower_anchors.get(title_lower)
+        if exact is not None:
+            return exact
+        for anchor_title_lower, anchor in lower_anchors.items():
+            if title_lower in anchor_title_lower or anchor_title_lower in title_lower:
+                return anchor
+        return None
+
+    def _split_hierarchical(
+        self, markdown_content: str, headers: list[MarkdownHeader]
+    ) -> Iterator[MarkdownSection]:
+        # Resolve every end offset in one reverse pass with a monotonic stack
+        # (nearest following header of the same or higher level) instead of a
+        # forward scan per header, which is quadratic on deep tables of
+        # contents
+        end_offsets = [len(markdown_content)] * len(headers)
+        stack: list[MarkdownHeader] = []
+        for i in range(len(headers) - 1, -1, -1):
+            header = headers[i]
+            while stack and stack[-1].level > header.level:
+                stack.pop()
+            if stack:
+                end_offsets[i] = stack[-1].offset
+            stack.append(header)
+
+        for i, header in enumerate(headers):
+            content = markdown_content[header.offset : end_offsets[i]].strip()
+            if content:
+                yield MarkdownSection(
+                    title=header.title,
+                    content=content,
+                    level=header.level,
+                    anchor=header.anchor,
+                )
+
+    def _split_non_hierarchical(
+        self, markdown_content: str, headers: list[MarkdownHeader]
+    ) -> Iterator[MarkdownSection]:
+        for i, header in enumerate(headers):
+            end_offset = (
+                headers[i + 1].offset
+                if i + 1 < len(headers)
+                else len(markdown_content)
+            )
+
+            content = markdown_content[header.offset : end_offset].strip()
+            if content:
+                yield MarkdownSection(
+                    title=header.title,
+                    content=content,
+                    level=header.level,
+                    anchor=header.anchor,
+                )
+
+
+@lru_cache(maxsize=len(SplittingMode))
+def _splitter_for_mode(splitting_mode: SplittingMode) -> MarkdownSectionSplitter:
+    return MarkdownSectionSplitter(splitting_mode)
+
+
+def get_splitter(
+    splitting_mode: SplittingMode = SplittingMode.HIERARCHICAL,
+) -> MarkdownSectionSplitter:
+    """Splitters hold no per-document state, so share one instance per mode
+    instead of constructing a fresh one per page."""
+    # lru_cache keys on the call signature, so defaulting happens out here -
+    # get_splitter() and get_splitter(SplittingMode.HIERARCHICAL) must share
+    return _splitter_for_mode(splitting_mode)
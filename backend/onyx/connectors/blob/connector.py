@@ -43,6 +43,14 @@ from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
 
+# botocore defaults to 10 pooled connections; subclasses that download
+# concurrently (e.g. the Backstage connector) need headroom beyond that so
+# requests reuse connections instead of queueing on the pool
+_S3_CLIENT_CONFIG = Config(
+    max_pool_connections=32,
+    tcp_keepalive=True,
+)
+
 
 class BlobStorageConnector(LoadConnector, PollConnector):
     def __init__(
@@ -120,7 +128,7 @@ class BlobStorageConnector(LoadConnector, PollConnector):
                     aws_access_key_id=credentials["aws_access_key_id"],
                     aws_secret_access_key=credentials["aws_secret_access_key"],
                 )
-                self.s3_client = session.client("s3")
+                self.s3_client = session.client("s3", config=_S3_CLIENT_CONFIG)
             elif authentication_method == "iam_role":
                 # If using IAM roles, we assume the role and let boto3 handle the credentials.
                 role_arn = credentials.get("aws_role_arn")
@@ -153,11 +161,11 @@ class BlobStorageConnector(LoadConnector, PollConnector):
                 botocore_session = get_session()
                 botocore_session._credentials = refreshable  # type: ignore[attr-defined]
                 session = boto3.Session(botocore_session=botocore_session)
-                self.s3_client = session.client("s3")
+                self.s3_client = session.client("s3", config=_S3_CLIENT_CONFIG)
             elif authentication_method == "assume_role":
                 # We will assume the instance role to access S3.
                 logger.debug("Using instance role authentication for S3 bucket.")
-                self.s3_client = boto3.client("s3")
+                self.s3_client = boto3.client("s3", config=_S3_CLIENT_CONFIG)
             else:
                 raise ConnectorValidationError("Invalid authentication method for S3. ")
 
@@ -1,5 +1,4 @@
 import re
-from copy import copy
 from dataclasses import dataclass
 from io import BytesIO
 from typing import IO
@@ -19,6 +18,16 @@ logger = setup_logger()
 
 MINTLIFY_UNWANTED = ["sticky", "hidden"]
 
+# Prefer the C-based lxml parser for tree construction; it is several times
+# faster than the pure-Python html.parser on typical pages. lxml is a hard
+# dependency, but keep the fallback so a broken install degrades gracefully.
+try:
+    import lxml  # noqa: F401
+
+    BS4_PARSER = "lxml"
+except ImportError:
+    BS4_PARSER = "html.parser"
+
 
 @dataclass
 class ParsedHTML:
@@ -26,19 +35,37 @@ class ParsedHTML:
     cleaned_text: str
 
 
+# These run per text node / per document in the cleanup hot path, so compile
+# them once at import instead of hitting the re module cache on every call
+_REPEATED_SPACE_RE = re.compile(r" +")
+_REPEATED_NEWLINE_RE = re.compile(r"[\n\r]+")
+# Fuses the old "strip trailing spaces" and "collapse repeated newlines"
+# passes: a run of newlines, with any single leftover spaces hanging on it
+# (spaces are already collapsed by the pass above), becomes one "\n"
+_NEWLINE_CLEANUP_RE = re.compile(r" ?[\n\r]+(?: [\n\r]+)*")
+
+# Tag-name groups tested for every element visited in format_document_soup;
+# module-level frozensets avoid rebuilding a list literal per element
+_TABLE_CELL_TAGS = frozenset(("td", "th"))
+_PARAGRAPH_TAGS = frozenset(("p", "div"))
+_HEADER_TAGS = frozenset(("h1", "h2", "h3", "h4"))
+
+
 def strip_excessive_newlines_and_spaces(document: str) -> str:
     # collapse repeated spaces into one
-    document = re.sub(r" +", " ", document)
-    # remove trailing spaces
-    document = re.sub(r" +[\n\r]", "\n", document)
-    # remove repeated newlines
-    document = re.sub(r"[\n\r]+", "\n", document)
+    document = _REPEATED_SPACE_RE.sub(" ", document)
+    # drop spaces hanging on newlines and collapse newline runs in one pass
+    document = _NEWLINE_CLEANUP_RE.sub("\n", document)
     return document.strip()
 
 
 def strip_newlines(document: str) -> str:
-    # HTML might contain newlines which are just whitespaces to a browser
-    return re.sub(r"[\n\r]+", " ", document)
+    # HTML might contain newlines which are just whitespaces to a browser.
+    # Most text nodes have none; the `in` scans run in C and skip the regex
+    # engine for those.
+    if "\n" not in document and "\r" not in document:
+        return document
+    return _REPEATED_NEWLINE_RE.sub(" ", document)
 
 
 def format_element_text(element_text: str, link_href: str | None) -> str:
@@ -54,15 +81,28 @@ def format_element_text(element_text: str, link_href: str | None) -> str:
     return f"[{element_text_no_newlines}]({link_href})"
 
 
+_TRAFILATURA_CONFIG = None
+
+
+def _get_trafilatura_config():  # type: ignore[no-untyped-def]
+    """Build the trafilatura config once; use_config re-reads the packaged
+    settings file on every call, which is wasteful per-document."""
+    global _TRAFILATURA_CONFIG
+    if _TRAFILATURA_CONFIG is None:
+        config = use_config()
+        config.set("DEFAULT", "include_links", "True")
+        config.set("DEFAULT", "include_tables", "True")
+        config.set("DEFAULT", "include_images", "True")
+        config.set("DEFAULT", "include_formatting", "True")
+        _TRAFILATURA_CONFIG = config
+    return _TRAFILATURA_CONFIG
+
+
 def parse_html_with_trafilatura(html_content: str) -> str:
     """Parse HTML content using trafilatura."""
-    config = use_config()
-    config.set("DEFAULT", "include_links", "True")
-    config.set("DEFAULT", "include_tables", "True")
-    config.set("DEFAULT", "include_images", "True")
-    config.set("DEFAULT", "include_formatting", "True")
-
-    extracted_text = trafilatura.extract(html_content, config=config)
+    extracted_text = trafilatura.extract(
+        html_content, config=_get_trafilatura_config()
+    )
     return strip_excessive_newlines_and_spaces(extracted_text) if extracted_text else ""
 
 
@@ -78,7 +118,11 @@ def format_document_soup(
     - Table columns/rows are separated by newline
     - List elements are separated by newline and start with a hyphen
     """
-    text = ""
+    # Accumulate into a list and join once at the end; building the document
+    # with `text +=` reallocates the whole string per append (quadratic on
+    # large pages). `last_char` mirrors what text[-1] used to provide.
+    parts: list[str] = []
+    last_char = ""
     list_element_start = False
     verbatim_output = 0
     in_table = False
@@ -111,69 +155,84 @@ def format_document_soup(
                 )
 
                 # Don't join separate elements without any spacing
-                if (text and not text[-1].isspace()) and (
+                if (last_char and not last_char.isspace()) and (
                     content_to_add and not content_to_add[0].isspace()
                 ):
-                    text += " "
+                    parts.append(" ")
 
-                text += content_to_add
+                if content_to_add:
+                    parts.append(content_to_add)
+                    last_char = content_to_add[-1]
 
                 list_element_start = False
         elif isinstance(e, bs4.element.Tag):
+            # resolve the tag name once per element instead of once per
+            # elif branch walked through
+            tag_name = e.name
             # table is standard HTML element
-            if e.name == "table":
+            if tag_name == "table":
                 in_table = True
             # tr is for rows
-            elif e.name == "tr" and in_table:
-                text += "\n"
+            elif tag_name == "tr" and in_table:
+                parts.append("\n")
+                last_char = "\n"
             # td for data cell, th for header
-            elif e.name in ["td", "th"] and in_table:
-                text += table_cell_separator
-            elif e.name == "/table":
+            elif tag_name in _TABLE_CELL_TAGS and in_table:
+                if table_cell_separator:
+                    parts.append(table_cell_separator)
+                    last_char = table_cell_separator[-1]
+            elif tag_name == "/table":
                 in_table = False
             elif in_table:
                 # don't handle other cases while in table
                 pass
-            elif e.name == "a":
+            elif tag_name == "a":
                 href_value = e.get("href", None)
                 # mostly for typing, having multiple hrefs is not valid HTML
                 link_href = (
                     href_value[0] if isinstance(href_value, list) else href_value
                 )
-            elif e.name == "/a":
+            elif tag_name == "/a":
                 link_href = None
-            elif e.name in ["p", "div"]:
+            elif tag_name in _PARAGRAPH_TAGS:
                 if not list_element_start:
-                    text += "\n"
-            elif e.name in ["h1", "h2", "h3", "h4"]:
-                text += "\n"
+                    parts.append("\n")
+                    last_char = "\n"
+            elif tag_name in _HEADER_TAGS:
+                parts.append("\n")
+                last_char = "\n"
                 list_element_start = False
                 last_added_newline = True
-            elif e.name == "br":
-                text += "\n"
+            elif tag_name == "br":
+                parts.append("\n")
+                last_char = "\n"
                 list_element_start = False
                 last_added_newline = True
-            elif e.name == "li":
-                text += "\n- "
+            elif tag_name == "li":
+                parts.append("\n- ")
+                last_char = " "
                 list_element_start = True
-            elif e.name == "pre":
+            elif tag_name == "pre":
                 if verbatim_output <= 0:
-                    verbatim_output = len(list(e.childGenerator()))
-    return strip_excessive_newlines_and_spaces(text)
+                    # count children without materializing them into a list
+                    verbatim_output = sum(1 for _ in e.children)
+    return strip_excessive_newlines_and_spaces("".join(parts))
 
 
-def parse_html_page_basic(text: str | BytesIO | IO[bytes]) -> str:
-    soup = bs4.BeautifulSoup(text, "html.parser")
+def parse_html_page_basic(text: str | bytes | BytesIO | IO[bytes]) -> str:
+    soup = bs4.BeautifulSoup(text, BS4_PARSER)
     return format_document_soup(soup)
 
 
 def web_html_cleanup(
-    page_content: str | bs4.BeautifulSoup,
+    page_content: str | bytes | bs4.BeautifulSoup,
     mintlify_cleanup_enabled: bool = True,
     additional_element_types_to_discard: list[str] | None = None,
 ) -> ParsedHTML:
-    if isinstance(page_content, str):
-        soup = bs4.BeautifulSoup(page_content, "html.parser")
+    if isinstance(page_content, (str, bytes)):
+        # bs4 accepts bytes directly and sniffs the declared encoding, so
+        # callers holding raw bytes don't need to pre-decode
+        soup = bs4.BeautifulSoup(page_content, BS4_PARSER)
     else:
         soup = page_content
 
@@ -183,31 +242,33 @@ def web_html_cleanup(
         title = title_tag.text
         title_tag.extract()
 
-    # Heuristics based cleaning of elements based on css classes
-    unwanted_classes = copy(WEB_CONNECTOR_IGNORED_CLASSES)
-    if mintlify_cleanup_enabled:
-        unwanted_classes.extend(MINTLIFY_UNWANTED)
-    for undesired_element in unwanted_classes:
-        [
+    # Heuristics based cleaning of elements based on css classes and tag
+    # names. One pass over the tree with set membership tests instead of a
+    # full find_all scan per unwanted class/element type.
+    unwanted_classes = frozenset(
+        WEB_CONNECTOR_IGNORED_CLASSES + MINTLIFY_UNWANTED
+        if mintlify_cleanup_enabled
+        else WEB_CONNECTOR_IGNORED_CLASSES
+    )
+    unwanted_tags = frozenset(
+        WEB_CONNECTOR_IGNORED_ELEMENTS + (additional_element_types_to_discard or [])
+    )
+    for tag in soup.find_all(True):
+        if tag.name in unwanted_tags:
+            tag.extract()
+            continue
+        tag_classes = tag.get("class")
+        if tag_classes and not unwanted_classes.isdisjoint(tag_classes):
             tag.extract()
-            for tag in soup.find_all(
-                class_=lambda x: x and undesired_element in x.split()
-            )
-        ]
-
-    for undesired_tag in WEB_CONNECTOR_IGNORED_ELEMENTS:
-        [tag.extract() for tag in soup.find_all(undesired_tag)]
-
-    if additional_element_types_to_discard:
-        for undesired_tag in additional_element_types_to_discard:
-            [tag.extract() for tag in soup.find_all(undesired_tag)]
 
-    soup_string = str(soup)
     page_text = ""
 
     if PARSE_WITH_TRAFILATURA:
         try:
-            page_text = parse_html_with_trafilatura(soup_string)
+            # str(soup) recursively re-serializes the whole tree (a Python
+            # frame per nested tag), so only pay for it when trafilatura
+            # actually consumes the string
+            page_text = parse_html_with_trafilatura(str(soup))
             if not page_text:
                 raise ValueError("Empty content returned by trafilatura.")
         except Exception as e:
@@ -216,7 +277,10 @@ def web_html_cleanup(
     else:
         page_text = format_document_soup(soup)
 
-    # 200B is ZeroWidthSpace which we don't care for
-    cleaned_text = page_text.replace("\u200b", "")
+    # 200B is ZeroWidthSpace which we don't care for; replace() always copies,
+    # so only pay for it when the character is actually present
+    cleaned_text = (
+        page_text.replace("\u200b", "") if "\u200b" in page_text else page_text
+    )
 
     return ParsedHTML(title=title, cleaned_text=cleaned_text)
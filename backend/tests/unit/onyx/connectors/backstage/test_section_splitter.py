@@ -0,0 +1,131 @@
+import pytest
+
+from onyx.connectors.backstage.section_splitter import (
+    extract_section_anchors_from_html,
+)
+from onyx.connectors.backstage.section_splitter import get_splitter
+from onyx.connectors.backstage.section_splitter import MarkdownSectionSplitter
+from onyx.connectors.backstage.section_splitter import SplittingMode
+
+
+@pytest.fixture
+def hierarchical_splitter() -> MarkdownSectionSplitter:
+    return MarkdownSectionSplitter(SplittingMode.HIERARCHICAL)
+
+
+@pytest.fixture
+def non_hierarchical_splitter() -> MarkdownSectionSplitter:
+    return MarkdownSectionSplitter(SplittingMode.NON_HIERARCHICAL)
+
+
+def test_parse_headers_basic(
+    hierarchical_splitter: MarkdownSectionSplitter,
+) -> None:
+    lines = [
+        "# Title",
+        "prose",
+        "## Subsection",
+        "####### seven hashes is not a header",
+        "#nospace is not a header",
+        "#",
+    ]
+    headers = hierarchical_splitter.parse_markdown_headers(lines, {})
+    assert [(h.level, h.title) for h in headers] == [(1, "Title"), (2, "Subsection")]
+    # offsets point at the start of each header's line in the joined document
+    document = "\n".join(lines)
+    for header in headers:
+        assert document[header.offset :].startswith("#" * header.level + " ")
+
+
+def test_parse_headers_skips_code_fences(
+    hierarchical_splitter: MarkdownSectionSplitter,
+) -> None:
+    lines = [
+        "# Real",
+        "```",
+        "# comment inside a fence",
+        "```",
+        "~~~",
+        "# another fenced comment",
+        "~~~",
+        "## Also Real",
+    ]
+    headers = hierarchical_splitter.parse_markdown_headers(lines, {})
+    assert [h.title for h in headers] == ["Real", "Also Real"]
+
+
+def test_hierarchical_sections_include_subsections(
+    hierarchical_splitter: MarkdownSectionSplitter,
+) -> None:
+    markdown = "# A\nbody\n## B\nsub\n# C\ntail"
+    sections = hierarchical_splitter.split_into_sections(markdown, {})
+    assert [(s.title, s.content) for s in sections] == [
+        ("A", "# A\nbody\n## B\nsub"),
+        ("B", "## B\nsub"),
+        ("C", "# C\ntail"),
+    ]
+
+
+def test_non_hierarchical_sections_cut_at_every_header(
+    non_hierarchical_splitter: MarkdownSectionSplitter,
+) -> None:
+    markdown = "# A\nbody\n## B\nsub\n# C\ntail"
+    sections = non_hierarchical_splitter.split_into_sections(markdown, {})
+    assert [(s.title, s.content) for s in sections] == [
+        ("A", "# A\nbody"),
+        ("B", "## B\nsub"),
+        ("C", "# C\ntail"),
+    ]
+
+
+def test_no_headers_yields_no_sections(
+    hierarchical_splitter: MarkdownSectionSplitter,
+) -> None:
+    assert hierarchical_splitter.split_into_sections("just prose\nno headers", {}) == []
+
+
+def test_anchor_resolution_prefers_extracted_anchors(
+    hierarchical_splitter: MarkdownSectionSplitter,
+) -> None:
+    markdown = "# Exact Match\ntext\n# CASED TITLE\ntext\n# Unknown Header\ntext"
+    section_anchors = {
+        "Exact Match": "exact-anchor",
+        "Cased Title": "cased-anchor",
+    }
+    sections = hierarchical_splitter.split_into_sections(markdown, section_anchors)
+    anchors = {s.title: s.anchor for s in sections}
+    assert anchors["Exact Match"] == "exact-anchor"
+    # case-only mismatches resolve through the lowered map
+    assert anchors["CASED TITLE"] == "cased-anchor"
+    # misses fall back to a slug generated from the title
+    assert anchors["Unknown Header"] == "unknown-header"
+
+
+def test_generated_anchors_strip_punctuation(
+    hierarchical_splitter: MarkdownSectionSplitter,
+) -> None:
+    sections = hierarchical_splitter.split_into_sections(
+        "# Setup & Config (v2)!\ntext", {}
+    )
+    assert sections[0].anchor == "setup-config-v2"
+
+
+def test_extract_section_anchors_from_html() -> None:
+    html = (
+        "<html><body>"
+        '<h1 id="overview">Overview'
+        '<a class="headerlink" href="#overview">&para;</a></h1>'
+        "<p>prose that should be ignored</p>"
+        '<h2 id="getting-started">Getting <em>Started</em></h2>'
+        "<h3>no id, skipped</h3>"
+        "</body></html>"
+    )
+    assert extract_section_anchors_from_html(html) == {
+        "Overview": "overview",
+        "Getting Started": "getting-started",
+    }
+
+
+def test_get_splitter_shares_instances_per_mode() -> None:
+    assert get_splitter() is get_splitter(SplittingMode.HIERARCHICAL)
+    assert get_splitter(SplittingMode.NON_HIERARCHICAL) is not get_splitter()